@@ -13,14 +13,24 @@ structured snapshots optimized for AI analysis and processing.
 """
 
 import argparse
+import codecs
 import fnmatch
 import hashlib
 import json
+import os
 import re
 import sys
 import time
+from collections import deque
+from collections.abc import Iterator
 from pathlib import Path
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# concurrent.futures (which pulls in logging), tempfile and shutil are imported
+# where they are used, so --version, --about and errors start faster
 
 # Project metadata (also embedded in output)
 __version__ = "1.0.0"
@@ -30,7 +40,10 @@ __source__ = "https://github.com/PaulTiffany/paleae"
 
 # --- Configuration ---
 MAX_SIZE = 10 * 1024 * 1024  # 10MB
+IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)  # Threads for blocking file reads
+WRITE_BUFFER = 1024 * 1024  # 1MB, so output goes to disk in few large writes
 PALEAEIGNORE = ".paleaeignore"
+_O_RDONLY_BINARY = os.O_RDONLY | getattr(os, "O_BINARY", 0)  # O_BINARY exists on Windows only
 
 TEXT_EXTS = {
     ".py",
@@ -65,6 +78,13 @@ TEXT_EXTS = {
     ".ps1",
 }
 
+# Build artifacts whose magic number or fixed header always puts a NUL byte in
+# the first KiB, so the content sniff would reject them anyway; skipping them
+# saves an open + read. Formats commonly tracked with Git LFS (images, archives,
+# fonts...) are left to the sniff: without LFS their checkout is a text pointer
+# file. Not .so either: GNU ld scripts such as libc.so are plain text.
+BINARY_EXTS = {".class", ".pyc", ".o"}
+
 DEFAULT_SKIP = [
     r"(^|/)\.(git|hg|svn)($|/)",
     r"(^|/)__pycache__($|/)",
@@ -104,22 +124,42 @@ def token_estimate(text: str) -> int:
     return max(1, len(text) // 4) if text else 0
 
 
-def is_text_file(path: Path) -> bool:
-    """Check if file should be treated as text."""
-    if not path.is_file():
-        return False
+def _suffix(name: str) -> str:
+    """Return the lowercased suffix of a file name, by the same rule as ``Path.suffix``."""
+    stem, _, ext = name.rpartition(".")
+    return f".{ext.lower()}" if stem and ext else ""
+
+
+def is_text_file(path: Path, size: Optional[int] = None) -> bool:
+    """Check if file should be treated as text.
+
+    Pass ``size`` when a stat result is already at hand (e.g. from
+    ``os.scandir``) to skip the extra ``is_file``/``stat`` calls.
+    """
+    suffix = _suffix(path.name)
     try:
-        size = path.stat().st_size
+        if size is None:
+            if not path.is_file():
+                return False
+            size = path.stat().st_size
         if size == 0:
-            return path.suffix.lower() in TEXT_EXTS or path.suffix == ""
-        if size > MAX_SIZE:
+            return not suffix or suffix in TEXT_EXTS
+        if size > MAX_SIZE or suffix in BINARY_EXTS:
             return False
-        with path.open("rb") as f:
-            chunk = f.read(min(1024, size))
+        # Raw fd I/O: no BufferedReader or 8 KiB buffer just to read 1 KiB
+        fd = os.open(path, _O_RDONLY_BINARY)
+        try:
+            chunk = os.read(fd, min(1024, size))
+        finally:
+            os.close(fd)
         if b"\x00" in chunk:
             return False
-        chunk.decode("utf-8")
-        return False
+        # Pure ASCII is valid UTF-8; isascii() is one C scan with no allocation.
+        # Otherwise decode incrementally, so a multi-byte character cut off at
+        # the end of the sniffed chunk is not mistaken for invalid UTF-8.
+        if not chunk.isascii():
+            codecs.getincrementaldecoder("utf-8")().decode(chunk, final=len(chunk) == size)
+        return True
     except (OSError, UnicodeDecodeError, PermissionError):
         return False
 
@@ -176,6 +216,176 @@ def matches_any(text: str, patterns: list[re.Pattern[str]]) -> bool:
     return any(p.search(text) for p in patterns)
 
 
+# Numbered group references change meaning once patterns are joined
+_GROUP_REF_RX = re.compile(r"\\[1-9]|\(\?\(\d")
+_BOUNDARY_PREFIX = "(^|/)"
+_BOUNDARY_LOOKBEHIND = "(?<![^/])"
+_QUANTIFIER_START = ("*", "+", "?", "{")
+
+
+def _fuse_patterns(patterns: list[re.Pattern[str]]) -> list[re.Pattern[str]]:
+    """Join patterns into a single alternation so each path is scanned once.
+
+    Returns the original list when the patterns cannot be combined safely
+    (mixed flags, numbered group references or global inline flags).
+    """
+    if len(patterns) <= 1:
+        return patterns
+    flags = patterns[0].flags
+    if any(p.flags != flags or _GROUP_REF_RX.search(p.pattern) for p in patterns):
+        return patterns
+    sources = [p.pattern for p in patterns]
+    if not flags & re.MULTILINE:
+        # A leading (^|/) is just a boundary test; as a lookbehind it stops
+        # hiding the literal after it from the engine's prefix search.
+        # Not when quantified: (^|/){2} consumes a slash, a lookbehind cannot.
+        n = len(_BOUNDARY_PREFIX)
+        sources = [
+            _BOUNDARY_LOOKBEHIND + s[n:]
+            if s.startswith(_BOUNDARY_PREFIX) and not s.startswith(_QUANTIFIER_START, n)
+            else s
+            for s in sources
+        ]
+    try:
+        return [re.compile("|".join(f"(?:{s})" for s in sources), flags)]
+    except re.error:
+        return patterns
+
+
+# Exclude patterns shaped like ``(^|/)NAME($|/)`` reject every path below a
+# directory called NAME, so those directories can be pruned by name alone.
+# A quantified prefix such as ``(^|/)?NAME`` is not a subtree exclusion.
+_DIR_PATTERN_RX = re.compile(r"\(\^\|/\)(?P<body>(?![*+?{]).+?)(?:\(\$\|/\)\??|/)?")
+_UNSAFE_BODY_RX = re.compile(r"[\^$]|\\[AZbB1-9]|\(\?(?!:)")
+# Each ``?`` doubles the expansion; bodies that would exceed this many names
+# use the fallback regex instead
+_MAX_EXPANSION = 256
+
+
+def _expand_literals(body: str) -> frozenset[str]:
+    """Expand a regex of literals, groups, ``|`` and ``?`` into every string it matches.
+
+    Raises ValueError for any other construct, or when the expansion would
+    exceed ``_MAX_EXPANSION`` strings.
+    """
+    pos = 0
+
+    def alternation() -> set[str]:
+        nonlocal pos
+        options = sequence()
+        while pos < len(body) and body[pos] == "|":
+            pos += 1
+            options |= sequence()
+            if len(options) > _MAX_EXPANSION:
+                raise ValueError("too many alternatives")
+        return options
+
+    def sequence() -> set[str]:
+        nonlocal pos
+        out = {""}
+        while pos < len(body) and body[pos] not in "|)":
+            ch = body[pos]
+            if ch == "(":
+                pos += 3 if body.startswith("(?:", pos) else 1
+                atom = alternation()
+                if pos >= len(body):
+                    raise ValueError("unbalanced group")
+                pos += 1
+            elif ch == "\\" and pos + 1 < len(body) and not body[pos + 1].isalnum():
+                atom = {body[pos + 1]}
+                pos += 2
+            elif ch in ".^$*+?{}[]\\":
+                raise ValueError(f"unsupported construct {ch!r}")
+            else:
+                atom = {ch}
+                pos += 1
+            if body.startswith("?", pos):
+                atom.add("")
+                pos += 1
+            if len(out) * len(atom) > _MAX_EXPANSION:
+                raise ValueError("too many alternatives")
+            out = {head + tail for head in out for tail in atom}
+        return out
+
+    result = alternation()
+    if pos != len(body):
+        raise ValueError("unbalanced group")
+    return frozenset(result)
+
+
+def _dir_pruner(
+    patterns: list[re.Pattern[str]],
+) -> tuple[frozenset[str], Optional[re.Pattern[str]]]:
+    """Return (literal names, fallback regex) for directories whose subtree is excluded.
+
+    Most bodies (``.git``, ``node_modules``, ``(build|dist)``...) expand to a few
+    literal names, checked with a set lookup; only the rest need a regex.
+    """
+    names: set[str] = set()
+    bodies = []
+    for p in patterns:
+        m = _DIR_PATTERN_RX.fullmatch(p.pattern)
+        if not m or p.flags != re.UNICODE or _UNSAFE_BODY_RX.search(m["body"]):
+            continue
+        try:
+            names |= _expand_literals(m["body"])
+        except ValueError:
+            bodies.append(f"(?:{m['body']})")
+    try:
+        prune_rx = re.compile("|".join(bodies)) if bodies else None
+    except re.error:  # a body that only parses in context, e.g. ``\`` from ``(^|/)\/``
+        prune_rx = None
+    return frozenset(names), prune_rx
+
+
+def _walk_files(
+    root: Path,
+    prune_names: frozenset[str] = frozenset(),
+    prune_rx: Optional[re.Pattern[str]] = None,
+) -> Iterator[tuple[str, os.DirEntry[str]]]:
+    """Yield (posix_rel_path, entry) for every file below root.
+
+    Uses ``os.scandir`` so file types come from the directory listing
+    itself. Symlinked directories are not followed and unreadable
+    subdirectories are skipped, matching ``Path.rglob``. Directories named
+    in ``prune_names`` or fully matching ``prune_rx`` are not entered at all.
+    """
+    # Directory names repeat across a tree (src, tests, utils...), so each
+    # distinct name goes through the fallback regex only once.
+    rx_verdicts: dict[str, bool] = {}
+    stack = [(str(root), "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            it = os.scandir(dir_path)
+        except OSError:
+            if not rel_dir:
+                raise
+            continue
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        with it:
+            for entry in it:
+                rel_path = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    name = entry.name
+                    if name in prune_names:
+                        continue
+                    if prune_rx:
+                        pruned = rx_verdicts.get(name)
+                        if pruned is None:
+                            pruned = rx_verdicts[name] = prune_rx.fullmatch(name) is not None
+                        if pruned:
+                            continue
+                    stack.append((entry.path, rel_path))
+                else:
+                    try:
+                        is_file = entry.is_file()
+                    except OSError:  # e.g. a symlink loop; Path.is_file says False
+                        continue
+                    if is_file:
+                        yield rel_path, entry
+
+
 def collect_files(
     root: Path,
     inc_patterns: list[re.Pattern[str]],
@@ -187,20 +397,19 @@ def collect_files(
     if not root.is_dir():
         raise PaleaeError(f"Directory not found: {root}")
 
-    files = []
-    try:
-        for path in root.rglob("*"):
-            if not path.is_file():
-                continue
-            try:
-                rel_path = path.relative_to(root).as_posix()
-            except ValueError:
-                continue
+    # A negation may re-include any path, so pruning is only safe without them
+    prune_names, prune_rx = (frozenset(), None) if ign_neg_patterns else _dir_pruner(exc_patterns)
+    # Default/CLI excludes and .paleaeignore patterns both exclude, so they
+    # share one alternation and each path is searched once for Step 1
+    excluded = _fuse_patterns(exc_patterns + ign_pos_patterns)
+    inc_patterns = _fuse_patterns(inc_patterns)
+    ign_neg_patterns = _fuse_patterns(ign_neg_patterns)
 
+    candidates = []
+    try:
+        for rel_path, entry in _walk_files(root, prune_names, prune_rx):
             # Step 1: Check if the path is excluded by default, CLI, or .paleaeignore
-            is_excluded = matches_any(rel_path, exc_patterns) or matches_any(
-                rel_path, ign_pos_patterns
-            )
+            is_excluded = matches_any(rel_path, excluded)
 
             # Step 2: A negative pattern (!) in .paleaeignore overrides any exclusion
             if is_excluded and matches_any(rel_path, ign_neg_patterns):
@@ -213,73 +422,229 @@ def collect_files(
             if inc_patterns and not matches_any(rel_path, inc_patterns):
                 continue
 
-            if is_text_file(path):
-                files.append(rel_path)
+            candidates.append((rel_path, entry))
     except (OSError, PermissionError) as e:
         raise PaleaeError(f"Error traversing {root}: {e}") from e
-    return sorted(files)
 
+    # Step 4: Sniff the survivors for text content, overlapping their I/O
+    from concurrent.futures import ThreadPoolExecutor  # noqa: PLC0415
+
+    with ThreadPoolExecutor(max_workers=IO_WORKERS) as pool:
+        verdicts = pool.map(_is_text_entry, [entry for _, entry in candidates])
+        files = [rel_path for (rel_path, _), ok in zip(candidates, verdicts) if ok]
+    files.sort()
+    return files
+
+
+def _is_text_entry(entry: os.DirEntry[str]) -> bool:
+    """Run is_text_file on a scandir entry, reusing its cached stat."""
+    # Known binary formats are rejected before entry.stat(), which is a real
+    # stat call on POSIX
+    if _suffix(entry.name) in BINARY_EXTS:
+        return False
+    try:
+        size = entry.stat().st_size
+    except OSError:
+        return False
+    return is_text_file(Path(entry.path), size)
+
+
+def _read_bytes(path: Path) -> bytes:
+    """Read a whole file, normally with one ``fstat``-sized ``os.read``.
+
+    A read returning exactly the ``fstat`` size is the whole file. Anything
+    else (a short read, as single reads are capped near 2 GiB, or a file
+    that changed since the stat) falls back to reading until EOF.
+    """
+    fd = os.open(path, _O_RDONLY_BINARY)
+    try:
+        size = os.fstat(fd).st_size
+        raw = os.read(fd, size + 1)
+        if len(raw) == size:
+            return raw
+        chunks = [raw]
+        while chunk := os.read(fd, 1024 * 1024):
+            chunks.append(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
+def _decode_text(raw: bytes) -> str:
+    """Decode UTF-8 bytes with universal newlines, matching ``Path.read_text``."""
+    text = raw.decode("utf-8", errors="ignore")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
 
-def build_snapshot(root: Path, rel_files: list[str], ignore_meta: dict[str, Any]) -> dict[str, Any]:
-    """Build complete snapshot data, including metadata."""
-    files_data, total_chars, total_tokens = [], 0, 0
-    for rel_path in rel_files:
-        full_path = root / rel_path
-        try:
-            content = full_path.read_text(encoding="utf-8", errors="ignore")
-            if not content.strip():
-                continue
-        except (OSError, PermissionError, UnicodeDecodeError):
-            continue
 
+# Copying a fresh context skips the per-call OpenSSL setup of hashlib.sha256()
+_EMPTY_SHA256 = hashlib.sha256()
+
+
+def _sha256_hex(raw: bytes) -> str:
+    """Return the hex SHA-256 digest of raw."""
+    h = _EMPTY_SHA256.copy()
+    h.update(raw)
+    return h.hexdigest()
+
+
+def _load_file(path: Path) -> Optional[tuple[str, str]]:
+    """Return (content, sha256) for a file, or None if it is unreadable or blank.
+
+    Runs on worker threads: reading and hashing release the GIL, so both
+    overlap across files.
+    """
+    try:
+        raw = _read_bytes(path)
+    except OSError:
+        return None
+    content = _decode_text(raw)
+    if not content or content.isspace():  # same as "not content.strip()", without a copy
+        return None
+    return content, _sha256_hex(raw)
+
+
+def _iter_loaded(paths: list[Path]) -> Iterator[Optional[tuple[str, str]]]:
+    """Yield ``_load_file`` results in order, loading ahead on a thread pool.
+
+    At most ``2 * IO_WORKERS`` loads are in flight, so memory stays bounded
+    no matter how many paths are passed.
+    """
+    from concurrent.futures import ThreadPoolExecutor  # noqa: PLC0415
+
+    with ThreadPoolExecutor(max_workers=IO_WORKERS) as pool:
+        pending: deque[Future[Optional[tuple[str, str]]]] = deque()
+        for path in paths:
+            pending.append(pool.submit(_load_file, path))
+            if len(pending) >= 2 * IO_WORKERS:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_file_records(root: Path, rel_files: list[str]) -> Iterator[dict[str, Any]]:
+    """Yield one snapshot record per readable, non-blank file, in order."""
+    loaded = _iter_loaded([root / rel_path for rel_path in rel_files])
+    for result, rel_path in zip(loaded, rel_files):
+        if result is None:
+            continue
+        content, sha256 = result
         chars = len(content)
-        tokens = token_estimate(content)
-        files_data.append(
-            {
-                "path": rel_path,
-                "content": content,
-                "size_chars": chars,
-                "sha256": hashlib.sha256(content.encode("utf-8", errors="ignore")).hexdigest(),
-                "estimated_tokens": tokens,
-            }
-        )
-        total_chars += chars
-        total_tokens += tokens
+        yield {
+            "path": rel_path,
+            "content": content,
+            "size_chars": chars,
+            "sha256": sha256,
+            "estimated_tokens": max(1, chars // 4),  # token_estimate(); content is never empty
+        }
 
+
+def _snapshot_meta(
+    root: Path, ignore_meta: dict[str, Any], files: int, chars: int, tokens: int
+) -> dict[str, Any]:
+    """Build the ``meta`` section for a snapshot with the given totals."""
     return {
-        "meta": {
-            "tool": "paleae",
-            "version": __version__,
-            "license": __license__,
-            "website": __website__,
-            "source": __source__,
-            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            "root_directory": str(root),
-            "ignore_file": ignore_meta,
-            "summary": {
-                "total_files": len(files_data),
-                "total_chars": total_chars,
-                "estimated_tokens": total_tokens,
-            },
+        "tool": "paleae",
+        "version": __version__,
+        "license": __license__,
+        "website": __website__,
+        "source": __source__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "root_directory": str(root),
+        "ignore_file": ignore_meta,
+        "summary": {
+            "total_files": files,
+            "total_chars": chars,
+            "estimated_tokens": tokens,
         },
+    }
+
+
+def build_snapshot(root: Path, rel_files: list[str], ignore_meta: dict[str, Any]) -> dict[str, Any]:
+    """Build complete snapshot data, including metadata."""
+    files_data = list(iter_file_records(root, rel_files))
+    total_chars = sum(row["size_chars"] for row in files_data)
+    total_tokens = sum(row["estimated_tokens"] for row in files_data)
+    return {
+        "meta": _snapshot_meta(root, ignore_meta, len(files_data), total_chars, total_tokens),
         "files": files_data,
     }
 
 
+# json.dumps builds a fresh JSONEncoder per call for non-default options;
+# the writers encode one record per call, so share instances instead
+_JSONL_ENCODER = json.JSONEncoder(ensure_ascii=False)
+_JSON_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=False)
+
+
+def _ensure_parent(path: Path) -> None:
+    """Create the parent directory of path; a bare filename needs none."""
+    parent = path.parent
+    if str(parent) not in ("", "."):
+        parent.mkdir(parents=True, exist_ok=True)
+
+
 def write_output(path: Path, data: dict[str, Any], format: str) -> None:
     """Write data as JSON or JSONL file."""
     try:
-        path.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_parent(path)
         if format == "json":
-            content = json.dumps(data, indent=2, ensure_ascii=False)
-            path.write_text(content, encoding="utf-8")
+            # json.dump streams encoder chunks instead of building one huge string
+            with path.open("w", buffering=WRITE_BUFFER, encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
         else:  # jsonl
-            with path.open("w", encoding="utf-8") as f:
-                f.write(json.dumps({"type": "meta", **data["meta"]}, ensure_ascii=False) + "\n")
+            with path.open("w", buffering=WRITE_BUFFER, encoding="utf-8") as f:
+                f.write(_JSONL_ENCODER.encode({"type": "meta", **data["meta"]}) + "\n")
                 for row in data["files"]:
-                    f.write(json.dumps({"type": "file", **row}, ensure_ascii=False) + "\n")
+                    f.write(_JSONL_ENCODER.encode({"type": "file", **row}) + "\n")
+    except (OSError, PermissionError) as e:
+        raise PaleaeError(f"Error writing {path}: {e}") from e
+
+
+def write_snapshot(
+    path: Path, root: Path, rel_files: list[str], ignore_meta: dict[str, Any], format: str
+) -> dict[str, Any]:
+    """Stream a snapshot to path and return its ``meta`` section.
+
+    Produces the same file as ``build_snapshot`` + ``write_output`` while
+    holding only a bounded read-ahead window of files (``2 * IO_WORKERS``) in
+    memory. File records are spooled to a temporary file until the totals
+    for the leading meta section are known.
+    """
+    import shutil  # noqa: PLC0415
+    import tempfile  # noqa: PLC0415
+
+    files = chars = tokens = 0
+    try:
+        _ensure_parent(path)
+        with tempfile.TemporaryFile(
+            "w+", buffering=WRITE_BUFFER, encoding="utf-8", dir=path.parent
+        ) as spool:
+            for row in iter_file_records(root, rel_files):
+                if format == "json":
+                    # Records sit two levels deep in json.dump(data, indent=2)
+                    record = _JSON_ENCODER.encode(row).replace("\n", "\n    ")
+                    spool.write(f",\n    {record}" if files else f"\n    {record}")
+                else:  # jsonl
+                    spool.write(_JSONL_ENCODER.encode({"type": "file", **row}) + "\n")
+                files += 1
+                chars += row["size_chars"]
+                tokens += row["estimated_tokens"]
+            meta = _snapshot_meta(root, ignore_meta, files, chars, tokens)
+            spool.seek(0)
+            with path.open("w", buffering=WRITE_BUFFER, encoding="utf-8") as f:
+                if format == "json":
+                    f.write('{\n  "meta": ' + _JSON_ENCODER.encode(meta).replace("\n", "\n  "))
+                    f.write(',\n  "files": [')
+                    shutil.copyfileobj(spool, f)
+                    f.write("\n  ]\n}" if files else "]\n}")
+                else:  # jsonl
+                    f.write(_JSONL_ENCODER.encode({"type": "meta", **meta}) + "\n")
+                    shutil.copyfileobj(spool, f)
     except (OSError, PermissionError) as e:
         raise PaleaeError(f"Error writing {path}: {e}") from e
+    return meta
 
 
 # --- CLI and Main Execution ---
@@ -345,12 +710,11 @@ def main() -> int:  # noqa: PLR0911
             return 1
 
         # --- Snapshot Generation & Output ---
-        data = build_snapshot(root, files, ignore_meta)
         out_path = Path(args.out) if args.out else Path(f"repo_snapshot.{args.format}")
-        write_output(out_path, data, args.format)
+        meta = write_snapshot(out_path, root, files, ignore_meta, args.format)
 
         # --- Summary ---
-        s = data["meta"]["summary"]
+        s = meta["summary"]
         print(f"✓ Snapshot saved to {out_path}")
         print(
             f"  Files: {s['total_files']}  "
@@ -1,5 +1,11 @@
-from hypothesis import HealthCheck, settings
 import os
+import sys
+from pathlib import Path
+
+from hypothesis import HealthCheck, settings
+
+# Make the repo-root paleae.py importable so tests share one cached module
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Strict CI profile: heavy exploration for regression/CI
 settings.register_profile(
@@ -18,19 +18,24 @@ validate that foundation.
 
 import argparse
 import fnmatch
+import hashlib
 import importlib.util
 import json
+import os
 import re
 import runpy
+import shutil
 import subprocess
 import sys
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 from hypothesis import HealthCheck, given, settings
 from hypothesis import strategies as st
 
+import paleae
+
 
 def load_paleae_module():
     """Load the paleae.py script as a module."""
@@ -40,20 +45,25 @@ def load_paleae_module():
         raise ImportError(f"Could not load spec for module paleae from {script_path}")
     paleae = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(paleae)
-    sys.modules["paleae"] = paleae
     return paleae
 
 
-paleae = load_paleae_module()
-
-
 # --- Fixtures ---
 
+# Property tests that write to tmp_path cap the active profile's example budget
+# (never raise it, so the mutation profile keeps its 25) and skip the deadline,
+# which disk latency makes flaky.
+disk_settings = settings(
+    max_examples=min(settings().max_examples, 50),
+    deadline=None,
+    suppress_health_check=[HealthCheck.function_scoped_fixture],
+)
+
 
-@pytest.fixture
-def temp_repo(tmp_path: Path):
-    """Create a temporary directory structure for testing."""
-    repo = tmp_path / "repo"
+@pytest.fixture(scope="session")
+def repo_template(tmp_path_factory: pytest.TempPathFactory):
+    """Build the sample repository once per session; temp_repo hands out copies."""
+    repo = tmp_path_factory.mktemp("template") / "repo"
     repo.mkdir()
     (repo / "src").mkdir()
     (repo / "tests").mkdir()
@@ -91,6 +101,16 @@ dist/
     return repo
 
 
+@pytest.fixture
+def temp_repo(tmp_path: Path, repo_template: Path):
+    """Create a temporary directory structure for testing."""
+    # Tests only add files, so hard links to the template's files are safe and
+    # spare re-writing them (notably the MAX_SIZE + 1 byte file) for every test
+    repo = tmp_path / "repo"
+    shutil.copytree(repo_template, repo, copy_function=os.link)
+    return repo
+
+
 # --- Unit Tests for Core Logic ---
 
 
@@ -132,24 +152,53 @@ def test_is_text_file(temp_repo):
     assert paleae.is_text_file(temp_repo / "empty.txt") is True
     (temp_repo / "empty_no_ext").touch()
     assert paleae.is_text_file(temp_repo / "empty_no_ext") is True
+    (temp_repo / ".empty_dotfile").touch()
+    assert paleae.is_text_file(temp_repo / ".empty_dotfile") is True
+    (temp_repo / "empty.PY").touch()
+    assert paleae.is_text_file(temp_repo / "empty.PY") is True
+    (temp_repo / "empty.bin").touch()
+    assert paleae.is_text_file(temp_repo / "empty.bin") is False
     assert paleae.is_text_file(temp_repo / "non_existent_file.txt") is False
     assert paleae.is_text_file(temp_repo / "bad_encoding.txt") is False
     assert paleae.is_text_file(temp_repo / "large_file.txt") is False
     # Test a file with a non-text extension but text content
     (temp_repo / "custom.ext").write_text("text content")
     assert paleae.is_text_file(temp_repo / "custom.ext") is True
+    # Non-ASCII content still has to be valid UTF-8
+    (temp_repo / "unicode.md").write_text("# Résumé ✓", encoding="utf-8")
+    assert paleae.is_text_file(temp_repo / "unicode.md") is True
+    (temp_repo / "latin1.md").write_bytes("# Résumé".encode("latin-1"))
+    assert paleae.is_text_file(temp_repo / "latin1.md") is False
+    # A multi-byte character straddling the 1 KiB sniff boundary is fine...
+    (temp_repo / "boundary.md").write_text("x" * 1023 + "é and more", encoding="utf-8")
+    assert paleae.is_text_file(temp_repo / "boundary.md") is True
+    # ...but one truncated by the end of the file is not
+    (temp_repo / "truncated.md").write_bytes(b"abc" + "é".encode()[:1])
+    assert paleae.is_text_file(temp_repo / "truncated.md") is False
+    # Known binary formats are rejected by extension, without opening the file
+    (temp_repo / "module.PYC").write_text("not really bytecode")
+    with patch("os.open") as mock_open:
+        assert paleae.is_text_file(temp_repo / "module.PYC") is False
+    mock_open.assert_not_called()
+    # Git LFS pointers keep their binary-looking name but are text
+    lfs_pointer = "version https://git-lfs.github.com/spec/v1\noid sha256:abc\nsize 12345\n"
+    (temp_repo / "logo.png").write_text(lfs_pointer)
+    assert paleae.is_text_file(temp_repo / "logo.png") is True
+    # .so is not a binary-only extension: GNU ld scripts are plain text
+    (temp_repo / "libc.so").write_text("/* GNU ld script */\nGROUP ( libc.so.6 )\n")
+    assert paleae.is_text_file(temp_repo / "libc.so") is True
     # Test directory
     assert paleae.is_text_file(temp_repo / "src") is False
     # Test permission error on read
-    with patch.object(Path, "open", side_effect=PermissionError):
+    with patch("os.open", side_effect=PermissionError):
         assert paleae.is_text_file(temp_repo / "src" / "main.py") is False
 
 
 # Strategy for content that is likely not UTF-8
-invalid_utf8_content = st.text(min_size=1).map(lambda s: s.encode("utf-16"))
+invalid_utf8_content = st.text(min_size=1, max_size=200).map(lambda s: s.encode("utf-16"))
 
 
-@settings(suppress_health_check=[HealthCheck.function_scoped_fixture])
+@disk_settings
 @given(content=invalid_utf8_content)
 def test_is_text_file_invalid_utf8_hypothesis(tmp_path, content):
     # Ensure we don't have null bytes, to isolate the unicode error
@@ -237,7 +286,7 @@ def test_read_paleaeignore_permission_error(temp_repo, capsys):
         assert f"Warning: Could not read {paleae.PALEAEIGNORE}" in captured.err
 
 
-@settings(suppress_health_check=[HealthCheck.function_scoped_fixture])
+@disk_settings
 @given(
     lines=st.lists(
         st.one_of(
@@ -309,6 +358,53 @@ def test_matches_any_hypothesis(text, patterns_str):
     assert result == manual_check
 
 
+def test_fuse_patterns():
+    patterns = paleae.compile_patterns(paleae.DEFAULT_SKIP)
+    fused = paleae._fuse_patterns(patterns)
+    assert len(fused) == 1
+    assert paleae.matches_any("a/node_modules/b.js", fused)
+    assert not paleae.matches_any("src/main.py", fused)
+    single = paleae.compile_patterns([r"\.py$"])
+    assert paleae._fuse_patterns(single) is single
+    assert paleae._fuse_patterns([]) == []
+    # The leading (^|/) is rewritten to a lookbehind, but not under MULTILINE
+    assert "(?<![^/])node_modules" in fused[0].pattern
+    multiline = [re.compile("(^|/)a", re.MULTILINE), re.compile("b", re.MULTILINE)]
+    assert paleae.matches_any("x\na", paleae._fuse_patterns(multiline))
+    # A quantified (^|/) consumes slashes, so it is left as is
+    quantified = paleae._fuse_patterns(paleae.compile_patterns([r"(^|/){2}x", "b"]))
+    assert not paleae.matches_any("a/x", quantified)
+    assert paleae.matches_any("a//x", quantified)
+
+
+@pytest.mark.parametrize(
+    "patterns",
+    [
+        [re.compile("a"), re.compile("b", re.IGNORECASE)],  # mixed flags
+        [re.compile(r"(a)\1"), re.compile("b")],  # numbered backreference
+        [re.compile("(?P<x>a)"), re.compile("(?P<x>b)")],  # duplicate group names
+    ],
+)
+def test_fuse_patterns_fallback(patterns):
+    assert paleae._fuse_patterns(patterns) is patterns
+
+
+@given(
+    text=st.text(max_size=100),
+    patterns_str=st.lists(
+        st.sampled_from(
+            [r"^a", r"b$", r"c\d", r"(^|/)x($|/)", r"(^|/)z", r"(^|/){2}w", r"(?s:y.*)\Z"]
+        ),
+        max_size=5,
+    ),
+)
+def test_fuse_patterns_hypothesis(text, patterns_str):
+    """A fused alternation matches exactly when any source pattern does."""
+    patterns = [re.compile(p) for p in patterns_str]
+    fused = paleae._fuse_patterns(patterns)
+    assert paleae.matches_any(text, fused) == paleae.matches_any(text, patterns)
+
+
 # --- Integration-like Tests for File Collection ---
 
 
@@ -352,21 +448,134 @@ def test_collect_files_with_cli_include_exclude(temp_repo):
     assert files == ["src/main.py"]
 
 
+def test_expand_literals():
+    assert paleae._expand_literals(r"\.(git|hg|svn)") == {".git", ".hg", ".svn"}
+    assert paleae._expand_literals(r"(\.?venv|env)") == {"venv", ".venv", "env"}
+    assert paleae._expand_literals(r"a(?:b|c)?d") == {"ad", "abd", "acd"}
+    many_optionals = "".join(f"{c}?" for c in "abcdefghijklmnopqrst")
+    many_options = "|".join(f"n{i}" for i in range(paleae._MAX_EXPANSION + 1))
+    for body in [r"\w+", "a*", "[ab]", "a)", "(a", "a\\", many_optionals, many_options]:
+        with pytest.raises(ValueError):
+            paleae._expand_literals(body)
+
+
+def test_dir_pruner():
+    names, rx = paleae._dir_pruner(paleae.compile_patterns(paleae.DEFAULT_SKIP))
+    assert rx is None
+    assert {".git", "__pycache__", ".venv", "venv", "node_modules", "dist", ".mypy_cache"} <= names
+    assert not {"src", "envs", ".gitignore", "distro"} & names
+    # Bodies that are not plain literals fall back to a regex
+    names, rx = paleae._dir_pruner(paleae.compile_patterns([r"(^|/)\w+_tmp($|/)", r"(^|/)x/"]))
+    assert names == {"x"}
+    assert rx.fullmatch("build_tmp") and not rx.fullmatch("tmp")
+    # Bodies that expand exponentially fall back to the regex
+    optionals = "".join(f"{c}?" for c in "abcdefghijklmnopqrstuvwxyz")
+    names, rx = paleae._dir_pruner(paleae.compile_patterns([f"(^|/){optionals}($|/)"]))
+    assert names == frozenset()
+    assert rx.fullmatch("az") and not rx.fullmatch("za")
+    # Patterns whose meaning depends on context are never used for pruning
+    unsafe = [r"\.py$", r"(^|/)a$b($|/)", r"(^|/)(?=x)x($|/)", r"(^|/)(a)\1($|/)"]
+    unsafe += [r"(^|/)?foo/", r"(^|/)+build($|/)", r"(^|/)*x", r"(^|/){1,2}tmp($|/)", r"(^|/)\/"]
+    assert paleae._dir_pruner(paleae.compile_patterns(unsafe)) == (frozenset(), None)
+    ignorecase = [re.compile(r"(^|/)foo($|/)", re.IGNORECASE)]
+    assert paleae._dir_pruner(ignorecase) == (frozenset(), None)
+
+
+def test_collect_files_prunes_excluded_dirs(temp_repo):
+    (temp_repo / "venv" / "lib.py").write_text("x = 1")
+    (temp_repo / "src" / "build_tmp").mkdir()
+    (temp_repo / "src" / "build_tmp" / "gen.py").write_text("x = 1")
+    (temp_repo / "tests" / "build_tmp").mkdir()
+    (temp_repo / "tests" / "build_tmp" / "gen.py").write_text("x = 1")
+    scanned = []
+    real_scandir = paleae.os.scandir
+
+    def scandir(path):
+        scanned.append(Path(path).name)
+        return real_scandir(path)
+
+    with patch("os.scandir", side_effect=scandir):
+        exc = paleae.compile_patterns([*paleae.DEFAULT_SKIP, r"(^|/)\w+_tmp($|/)"])
+        files = paleae.collect_files(temp_repo, [], exc, [], [])
+    assert "venv/lib.py" not in files
+    assert "src/build_tmp/gen.py" not in files
+    assert "tests/build_tmp/gen.py" not in files
+    assert "src/main.py" in files
+    assert not {".git", "venv", "__pycache__", "dist", "build_tmp"} & set(scanned)
+
+
+def test_collect_files_quantified_prefix_excludes(temp_repo):
+    everything = paleae.collect_files(temp_repo, [], [], [], [])
+    for pattern in [
+        r"(^|/)?src/",
+        r"(^|/)+build($|/)",
+        r"(^|/)*x",
+        r"(^|/){1,2}tmp($|/)",
+        r"(^|/)\/",
+    ]:
+        exc = paleae.compile_patterns([pattern])
+        files = paleae.collect_files(temp_repo, [], exc, [], [])
+        assert files == [f for f in everything if not exc[0].search(f)]
+
+
+def test_collect_files_negation_disables_pruning(temp_repo):
+    (temp_repo / "venv" / "keep.py").write_text("x = 1")
+    neg = paleae.compile_patterns(paleae._translate_globs_to_regex(["venv/keep.py"]))
+    exc = paleae.compile_patterns(paleae.DEFAULT_SKIP)
+    files = paleae.collect_files(temp_repo, [], exc, [], neg)
+    assert "venv/keep.py" in files
+
+
 def test_collect_files_non_existent_dir():
     with pytest.raises(paleae.PaleaeError, match="Directory not found"):
         paleae.collect_files(Path("nonexistent"), [], [], [], [])
 
 
 def test_collect_files_permission_error(temp_repo):
-    with patch.object(Path, "rglob", side_effect=PermissionError("Access denied")):
+    with patch("os.scandir", side_effect=PermissionError("Access denied")):
         with pytest.raises(paleae.PaleaeError, match="Error traversing"):
             paleae.collect_files(temp_repo, [], [], [], [])
 
 
-def test_collect_files_value_error_on_relative_to(temp_repo):
-    with patch.object(Path, "relative_to", side_effect=ValueError):
+def test_collect_files_skips_unreadable_subdirectory(temp_repo):
+    real_scandir = paleae.os.scandir
+
+    def scandir(path):
+        if Path(path).name == "src":
+            raise PermissionError("Access denied")
+        return real_scandir(path)
+
+    with patch("os.scandir", side_effect=scandir):
         files = paleae.collect_files(temp_repo, [], [], [], [])
-        assert files is not None
+    assert "README.md" in files
+    assert not any(f.startswith("src/") for f in files)
+
+
+def test_collect_files_stat_error(temp_repo):
+    with patch("os.DirEntry.stat", side_effect=OSError("Vanished")):
+        assert paleae.collect_files(temp_repo, [], [], [], []) == []
+
+
+def test_is_text_entry_binary_ext_skips_stat(temp_repo):
+    entry = MagicMock(path=str(temp_repo / "module.PYC"))
+    entry.name = "module.PYC"
+    assert paleae._is_text_entry(entry) is False
+    entry.stat.assert_not_called()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="symlinks need privileges on Windows")
+def test_collect_files_symlinks(temp_repo):
+    (temp_repo / "linked_src").symlink_to(temp_repo / "src", target_is_directory=True)
+    (temp_repo / "linked_readme.md").symlink_to(temp_repo / "README.md")
+    (temp_repo / "dangling.md").symlink_to(temp_repo / "missing.md")
+    (temp_repo / "self.md").symlink_to(temp_repo / "self.md")
+    (temp_repo / "src" / "b.md").symlink_to(temp_repo / "src" / "c.md")
+    (temp_repo / "src" / "c.md").symlink_to(temp_repo / "src" / "b.md")
+    files = paleae.collect_files(temp_repo, [], [], [], [])
+    assert not {"self.md", "src/b.md", "src/c.md"} & set(files)
+    assert "linked_readme.md" in files
+    assert "dangling.md" not in files
+    assert not any(f.startswith("linked_src/") for f in files)
 
 
 # --- Tests for Snapshot Building and Writing ---
@@ -391,6 +600,8 @@ def test_build_snapshot(temp_repo):
     readme_data = next(f for f in data["files"] if f["path"] == "README.md")
     content = "print('hello')"
     assert main_py_data["content"] == content
+    raw = (temp_repo / "src" / "main.py").read_bytes()
+    assert main_py_data["sha256"] == hashlib.sha256(raw).hexdigest()
     assert main_py_data["size_chars"] == len(content)
     assert main_py_data["estimated_tokens"] > 0
     assert readme_data["content"] == "# My Project"
@@ -414,18 +625,53 @@ def test_build_snapshot_skips_empty_files(temp_repo):
 
 
 def test_build_snapshot_read_error(temp_repo):
-    with patch.object(Path, "read_text", side_effect=OSError("Read error")):
+    with patch("paleae._read_bytes", side_effect=OSError("Read error")):
         data = paleae.build_snapshot(temp_repo, ["src/main.py"], {})
         assert len(data["files"]) == 0
 
 
-@settings(suppress_health_check=[HealthCheck.function_scoped_fixture])
+def test_read_bytes(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"abc\x00def")
+    assert paleae._read_bytes(path) == b"abc\x00def"
+    (tmp_path / "empty.txt").touch()
+    assert paleae._read_bytes(tmp_path / "empty.txt") == b""
+    # A file that grew after fstat is still read to the end
+    with patch("os.fstat") as mock_fstat:
+        mock_fstat.return_value.st_size = 0
+        assert paleae._read_bytes(path) == b"abc\x00def"
+    # A short read is not EOF: large reads are capped per call by the OS
+    real_read = os.read
+    with patch("os.read", side_effect=lambda fd, n: real_read(fd, min(n, 3))):
+        assert paleae._read_bytes(path) == b"abc\x00def"
+
+
+def test_build_snapshot_normalizes_newlines(temp_repo):
+    (temp_repo / "crlf.txt").write_bytes(b"one\r\ntwo\rthree\n")
+    data = paleae.build_snapshot(temp_repo, ["crlf.txt"], {})
+    assert data["files"][0]["content"] == "one\ntwo\nthree\n"
+    assert data["files"][0]["content"] == (temp_repo / "crlf.txt").read_text(encoding="utf-8")
+    # The hash covers the bytes on disk, not the normalized text
+    assert data["files"][0]["sha256"] == hashlib.sha256(b"one\r\ntwo\rthree\n").hexdigest()
+
+
+def test_iter_file_records_keeps_order_past_read_ahead_window(tmp_path):
+    rel_files = [f"f{i}.txt" for i in range(7)]
+    for i, rel_path in enumerate(rel_files):
+        (tmp_path / rel_path).write_text(f"file {i}")
+    with patch("paleae.IO_WORKERS", 1):
+        records = list(paleae.iter_file_records(tmp_path, rel_files))
+    assert [r["path"] for r in records] == rel_files
+    assert records[-1]["content"] == "file 6"
+
+
+@disk_settings
 @given(
     file_contents=st.dictionaries(
         keys=st.text(
             st.characters(min_codepoint=97, max_codepoint=122), min_size=1, max_size=10
         ).map(lambda s: f"{s}.txt"),
-        values=st.text(min_size=1, max_size=1000),  # Ensure content is not empty
+        values=st.text(min_size=1, max_size=200),  # Ensure content is not empty
         min_size=1,
         max_size=10,
     )
@@ -453,8 +699,10 @@ def test_build_snapshot_summary_invariant(tmp_path, file_contents):
     # as some might have been skipped (e.g., if they became empty after stripping)
     included_paths = {f["path"] for f in files_data}
 
-    expected_chars = sum(len(file_contents[p]) for p in included_paths)
-    expected_tokens = sum(paleae.token_estimate(file_contents[p]) for p in included_paths)
+    # Content is read with universal newlines, exactly like Path.read_text
+    read_back = {p: (tmp_path / p).read_text(encoding="utf-8") for p in included_paths}
+    expected_chars = sum(len(text) for text in read_back.values())
+    expected_tokens = sum(paleae.token_estimate(text) for text in read_back.values())
 
     assert summary["total_chars"] == expected_chars
     assert summary["estimated_tokens"] == expected_tokens
@@ -469,6 +717,22 @@ def test_write_output_json(tmp_path):
     assert content["files"][0]["path"] == "a.py"
 
 
+def test_write_output_json_matches_dumps(tmp_path):
+    out_path = tmp_path / "snapshot.json"
+    data = {"meta": {"tool": "paleae"}, "files": [{"path": "é.py", "content": "ünïcode"}]}
+    paleae.write_output(out_path, data, "json")
+    expected = json.dumps(data, indent=2, ensure_ascii=False)
+    assert out_path.read_text(encoding="utf-8") == expected
+
+
+def test_write_output_bare_filename_skips_mkdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with patch.object(Path, "mkdir") as mock_mkdir:
+        paleae.write_output(Path("snapshot.json"), {"meta": {}, "files": []}, "json")
+    mock_mkdir.assert_not_called()
+    assert (tmp_path / "snapshot.json").exists()
+
+
 def test_write_output_jsonl(tmp_path):
     out_path = tmp_path / "snapshot.jsonl"
     file_data = [
@@ -490,11 +754,36 @@ def test_write_output_jsonl(tmp_path):
     assert file1["type"] == "file"
     assert file1["path"] == "a.py"
     assert file2["path"] == "b.py"
+    assert lines[1] == json.dumps({"type": "file", **file_data[0]}, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("fmt", ["json", "jsonl"])
+@pytest.mark.parametrize(
+    "files", [["src/main.py", "README.md", "unicode.txt", "non_existent.txt"], []]
+)
+def test_write_snapshot_matches_write_output(temp_repo, tmp_path, fmt, files):
+    (temp_repo / "unicode.txt").write_text('héllo\n\t"quoted"\n', encoding="utf-8")
+    ignore_meta = {"file": ".paleaeignore", "present": True, "patterns": 2, "negations": 1}
+    buffered, streamed = tmp_path / f"buffered.{fmt}", tmp_path / "out" / f"streamed.{fmt}"
+    with patch("time.strftime", return_value="2025-09-14T12:00:00Z"):
+        data = paleae.build_snapshot(temp_repo, files, ignore_meta)
+        paleae.write_output(buffered, data, fmt)
+        meta = paleae.write_snapshot(streamed, temp_repo, files, ignore_meta, fmt)
+    assert meta == data["meta"]
+    assert streamed.read_bytes() == buffered.read_bytes()
+    assert list(streamed.parent.iterdir()) == [streamed]  # spool file is gone
+
+
+def test_write_snapshot_permission_error(temp_repo, tmp_path):
+    out_path = tmp_path / "snapshot.jsonl"
+    with patch.object(Path, "open", side_effect=PermissionError("Access denied")):
+        with pytest.raises(paleae.PaleaeError, match="Error writing"):
+            paleae.write_snapshot(out_path, temp_repo, ["README.md"], {}, "jsonl")
 
 
 def test_write_output_permission_error(tmp_path):
     out_path = tmp_path / "snapshot.json"
-    with patch.object(Path, "write_text", side_effect=PermissionError("Access denied")):
+    with patch.object(Path, "open", side_effect=PermissionError("Access denied")):
         with pytest.raises(paleae.PaleaeError, match="Error writing"):
             paleae.write_output(out_path, {"meta": {}, "files": []}, "json")
 
@@ -502,25 +791,20 @@ def test_write_output_permission_error(tmp_path):
 # --- Tests for CLI and Main Execution ---
 
 
-@patch("paleae.write_output")
-@patch("paleae.build_snapshot")
+@patch("paleae.write_snapshot")
 @patch("paleae.collect_files")
-def test_main_success(mock_collect, mock_build, mock_write, temp_repo, capsys):
+def test_main_success(mock_collect, mock_write, temp_repo, capsys):
     mock_collect.return_value = ["src/main.py"]
-    mock_build.return_value = {
-        "meta": {
-            "summary": {
-                "total_files": 1,
-                "total_chars": 100,
-                "estimated_tokens": 25,
-            }
-        },
-        "files": [{"path": "src/main.py"}],
+    mock_write.return_value = {
+        "summary": {
+            "total_files": 1,
+            "total_chars": 100,
+            "estimated_tokens": 25,
+        }
     }
     with patch("sys.argv", ["paleae", str(temp_repo)]):
         assert paleae.main() == 0
     mock_collect.assert_called_once()
-    mock_build.assert_called_once()
     mock_write.assert_called_once()
     captured = capsys.readouterr()
     assert "Snapshot saved to" in captured.out
@@ -592,25 +876,26 @@ def test_main_with_output_file(temp_repo, capsys):
     output_file = temp_repo / "output.json"
     with patch("sys.argv", ["paleae", str(temp_repo), "-o", str(output_file)]):
         with patch("paleae.collect_files", return_value=["README.md"]):
-            with patch(
-                "paleae.build_snapshot",
-                return_value={
-                    "meta": {
-                        "summary": {
-                            "total_files": 1,
-                            "total_chars": 12,
-                            "estimated_tokens": 3,
-                        }
-                    },
-                    "files": [{"path": "README.md"}],
-                },
-            ):
-                paleae.main()
+            paleae.main()
     assert output_file.exists()
+    assert json.loads(output_file.read_text())["files"][0]["path"] == "README.md"
     captured = capsys.readouterr()
     assert f"Snapshot saved to {output_file}" in captured.out
 
 
+def test_main_jsonl_streams_snapshot(temp_repo, capsys):
+    output_file = temp_repo / "output.jsonl"
+    with patch("sys.argv", ["paleae", str(temp_repo), "-f", "jsonl", "-o", str(output_file)]):
+        with patch("paleae.build_snapshot") as mock_build:
+            assert paleae.main() == 0
+    mock_build.assert_not_called()
+    lines = [json.loads(line) for line in output_file.read_text(encoding="utf-8").splitlines()]
+    summary = lines[0]["summary"]
+    assert summary["total_files"] == len(lines) - 1
+    captured = capsys.readouterr()
+    assert f"Files: {summary['total_files']}" in captured.out
+
+
 def test_main_profile_and_extra_patterns(temp_repo):
     with patch(
         "sys.argv",
@@ -636,8 +921,12 @@ def test_main_profile_and_extra_patterns(temp_repo):
             assert any(p.pattern == "src" for p in exc_patterns)
 
 
+@pytest.mark.skipif(
+    not os.getenv("PALEAE_SUBPROCESS_TESTS"),
+    reason="spawns an interpreter; test_main_runpy_about covers __main__ in-process",
+)
 def test_main_entrypoint():
-    """Test running the script directly."""
+    """Test running the script directly (set PALEAE_SUBPROCESS_TESTS=1 to enable)."""
     script_path = Path(__file__).parent.parent / "paleae.py"
     result = subprocess.run(
         [sys.executable, str(script_path), "--about"],